@@ -1,13 +1,16 @@
 # src/analyzer.py
 
-from src.cloner import process_repo_clone
-from src.file_processing import process_repository_for_json
+import asyncio
+
+from src.cloner import process_repo_clone, process_repo_clone_async
+from src.file_processing import PARSE_WORKERS, process_repository_for_json, iter_process_repository
 
 
 def analyze_repository(repo_url: str, user_intent: str) -> dict:
     """
     Minimal service wrapper:
     repo_url -> raw pipeline JSON
+    Parses in-process, so plain scripts can call it without a __main__ guard.
     """
 
     cloned_repo_path = process_repo_clone(repo_url)
@@ -22,3 +25,58 @@ def analyze_repository(repo_url: str, user_intent: str) -> dict:
         "user_intent": user_intent,
         "analysis": files_json
     }
+
+
+async def analyze_repository_async(repo_url: str, user_intent: str) -> dict:
+    """
+    Async variant of analyze_repository for the API:
+    the clone runs as a non-blocking subprocess and parsing off the event loop
+    (large repositories fan out to PARSE_WORKERS worker processes).
+    The clone stays locked against updates and eviction until parsing is done.
+    """
+
+    async with process_repo_clone_async(repo_url) as cloned_repo_path:
+        if not cloned_repo_path:
+            raise ValueError("Invalid GitHub repository URL")
+
+        files_json = await asyncio.to_thread(process_repository_for_json, cloned_repo_path, PARSE_WORKERS)
+
+    return {
+        "repo_url": repo_url,
+        "user_intent": user_intent,
+        "analysis": files_json
+    }
+
+
+async def _stream_records(repo_url: str, user_intent: str):
+    async with process_repo_clone_async(repo_url) as cloned_repo_path:
+        if not cloned_repo_path:
+            raise ValueError("Invalid GitHub repository URL")
+
+        yield {"repo_url": repo_url, "user_intent": user_intent}
+
+        file_entries = iter_process_repository(cloned_repo_path, PARSE_WORKERS)
+        # Each step parses or resolves hints, so it runs off the event loop
+        while (file_entry := await asyncio.to_thread(next, file_entries, None)) is not None:
+            yield file_entry
+
+
+async def analyze_repository_stream(repo_url: str, user_intent: str):
+    """
+    Streaming variant for large repositories:
+    clones, then returns an async iterator of records - a header record with the
+    request details followed by one record per analyzed file. The clone stays
+    locked until the iterator is exhausted or closed.
+    """
+
+    records = _stream_records(repo_url, user_intent)
+    # Runs up to the header, so a bad URL or failed clone raises here,
+    # before any response is sent
+    header = await anext(records)
+
+    async def all_records():
+        yield header
+        async for record in records:
+            yield record
+
+    return all_records()
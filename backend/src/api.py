@@ -1,15 +1,43 @@
 # src/api.py
 
+from contextlib import asynccontextmanager
+
+import orjson
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from dotenv import load_dotenv
 load_dotenv()
 
 
-from src.analyzer import analyze_repository
+from src.analyzer import analyze_repository_async, analyze_repository_stream
+from src.file_processing import warm_up_parsers
+
+
+class ORJSONResponse(Response):
+    """
+    JSON response rendered by orjson; analysis payloads carry a lot of source
+    code, which the stdlib encoder escapes slowly.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
 
-app = FastAPI(title="Git Visually Backend")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail at startup, not on the first request, if a parser is broken
+    warm_up_parsers()
+    yield
+
+
+app = FastAPI(
+    title="Git Visually Backend",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -22,21 +50,26 @@ app.add_middleware(
 
 
 class AnalyzeRepoRequest(BaseModel):
+    # Unknown fields from the client are dropped without per-field errors
+    model_config = ConfigDict(extra="ignore")
+
     repo_url: str
     query: str | None = None
     user_intent: str | None = None
 
 
 @app.post("/analyze")
-def analyze_repo(request: AnalyzeRepoRequest):
+async def analyze_repo(request: AnalyzeRepoRequest):
     try:
         # Use 'query' if provided, otherwise fall back to 'user_intent'
         intent = request.query or request.user_intent or ""
         
-        return analyze_repository(
+        result = await analyze_repository_async(
             repo_url=request.repo_url,
             user_intent=intent
         )
+        # Returned as a response, so FastAPI skips jsonable_encoder on the payload
+        return ORJSONResponse(result)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -44,3 +77,30 @@ def analyze_repo(request: AnalyzeRepoRequest):
             status_code=500,
             detail=str(e)
         )
+
+
+@app.post("/analyze/stream")
+async def analyze_repo_stream(request: AnalyzeRepoRequest):
+    """
+    Same analysis as /analyze, sent as NDJSON: a header line with repo_url and
+    user_intent, then one line per file as soon as it is ready.
+    """
+    try:
+        intent = request.query or request.user_intent or ""
+
+        records = await analyze_repository_stream(
+            repo_url=request.repo_url,
+            user_intent=intent
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=str(e)
+        )
+
+    return StreamingResponse(
+        (orjson.dumps(record) + b"\n" async for record in records),
+        media_type="application/x-ndjson"
+    )
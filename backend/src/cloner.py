@@ -1,9 +1,70 @@
 import os
+import re
+import asyncio
 import subprocess
 import shutil
-import os
+import hashlib
+from contextlib import asynccontextmanager
+
+import pygit2
+
+from src.file_processing import VALID_EXTENSIONS
 
 REPO_CLONER_DIR = os.getenv("REPO_CLONER_DIR", "output")
+REPO_CACHE_MAX_ENTRIES = int(os.getenv("REPO_CACHE_MAX_ENTRIES", "8"))
+SPARSE_CHECKOUT_PATTERNS = [f"*{extension}" for extension in VALID_EXTENSIONS]
+# Directory names produced by get_clone_cache_path: <repo_name>-<16 hex digits>
+_CLONE_CACHE_DIR_RE = re.compile(r".+-[0-9a-f]{16}")
+
+
+class CloneLock:
+    """
+    Reader/writer lock for one cached clone: updates (clone, fetch, reset) are
+    exclusive, analyses reading the working tree share it. Waiting writers
+    hold back new readers so a steady stream of analyses cannot starve updates.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+        # Requests currently holding or waiting for the lock
+        self.users = 0
+
+    @asynccontextmanager
+    async def read(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writing and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self):
+        async with self._condition:
+            self._writers_waiting += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writing and not self._readers)
+            finally:
+                self._writers_waiting -= 1
+                # A cancelled writer may have been holding readers back
+                self._condition.notify_all()
+            self._writing = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+# Locks of the cached clones in use by async requests, dropped once unused
+_clone_locks = {}
 
 
 def validate_url(url):
@@ -15,17 +76,159 @@ def validate_url(url):
             return False
     return False
 
-def clone_repository(github_url, output_dir):
+def get_clone_cache_path(github_url, output_dir):
+    """
+    Clones are cached per repository URL, so repeated analyses of the same
+    repository only fetch what changed upstream.
+    """
+    normalized_url = github_url[:-4] if github_url.endswith('.git') else github_url
+    repo_name = normalized_url.split('/')[-1]
+    cache_key = hashlib.blake2b(normalized_url.encode(), digest_size=8).hexdigest()
+    return os.path.join(output_dir, f"{repo_name}-{cache_key}")
+
+def is_clone_current(cloned_repo_path):
+    """
+    Asks the remote for its HEAD through libgit2, in-process, and compares it
+    with the cached clone's. An unchanged repository then needs no git
+    subprocess at all; fetching and checkout stay with the git CLI because
+    libgit2 supports neither blobless clones nor sparse checkouts.
+    """
+    try:
+        repo = pygit2.Repository(cloned_repo_path)
+        remote_heads = repo.remotes["origin"].list_heads()
+        local_head = repo.head.target
+    except (pygit2.GitError, KeyError, ValueError):
+        return False
+
+    return any(head.name == "HEAD" and head.oid == local_head for head in remote_heads)
+
+def _clone_commands(github_url, cloned_repo_path):
+    if os.path.isdir(os.path.join(cloned_repo_path, ".git")):
+        return [
+            ["git", "-C", cloned_repo_path, "fetch", "--depth=1", "origin", "HEAD"],
+            ["git", "-C", cloned_repo_path, "reset", "--hard", "FETCH_HEAD"],
+        ]
+    # Blobless, sparse clone: only blobs of the source files we analyze are downloaded
+    return [
+        ["git", "clone", "--filter=blob:none", "--depth=1", "--sparse", github_url, cloned_repo_path],
+        ["git", "-C", cloned_repo_path, "sparse-checkout", "set", "--no-cone", *SPARSE_CHECKOUT_PATTERNS],
+    ]
+
+def _stale_clone_paths(output_dir, keep_path, in_use_paths):
+    in_use = {os.path.abspath(path) for path in in_use_paths}
+    in_use.add(os.path.abspath(keep_path))
+    cached = [
+        entry for entry in os.scandir(output_dir)
+        if _CLONE_CACHE_DIR_RE.fullmatch(entry.name)
+        and entry.is_dir(follow_symlinks=False)
+        and os.path.abspath(entry.path) not in in_use
+    ]
+    cached.sort(key=lambda entry: entry.stat(follow_symlinks=False).st_mtime, reverse=True)
+    return [entry.path for entry in cached[max(REPO_CACHE_MAX_ENTRIES - 1, 0):]]
+
+def evict_stale_clones(output_dir, keep_path):
+    """
+    Keeps at most REPO_CACHE_MAX_ENTRIES cached clones, dropping the least
+    recently analyzed ones first. Only directories named like cache entries are
+    considered, so anything else in output_dir is left alone.
+
+    Clones in use are tracked per process: with several server workers (e.g.
+    uvicorn --workers N) one worker can still evict or update a clone another
+    is analyzing, so run a single worker or give each its own REPO_CLONER_DIR.
+    """
+    # Clones an async request is updating or analyzing are never evicted
+    for stale_path in _stale_clone_paths(output_dir, keep_path, list(_clone_locks)):
+        shutil.rmtree(stale_path, ignore_errors=True)
+
+async def _evict_stale_clones_async(output_dir, keep_path):
+    stale_paths = await asyncio.to_thread(_stale_clone_paths, output_dir, keep_path, list(_clone_locks))
+    for stale_path in stale_paths:
+        # A request may have picked the clone up while the directory was scanned
+        if stale_path in _clone_locks:
+            continue
+        # Unused, so taking the write side never waits; requests arriving
+        # meanwhile wait for the removal and then clone afresh
+        async with _held_clone_lock(stale_path) as clone_lock, clone_lock.write():
+            await asyncio.to_thread(shutil.rmtree, stale_path, ignore_errors=True)
+
+def _prepare_clone_path(github_url, output_dir):
     os.makedirs(output_dir, exist_ok=True)
-    
-    repo_name_with_git_suffix = github_url.split('/')[-1]
-    repo_name = repo_name_with_git_suffix[:-4] if repo_name_with_git_suffix.endswith('.git') else repo_name_with_git_suffix
-    
-    cloned_repo_path = os.path.join(output_dir, repo_name)
-    subprocess.run(["git", "clone", "--depth=1", github_url, cloned_repo_path], check=True)
-    
+
+    cloned_repo_path = get_clone_cache_path(github_url, output_dir)
+    is_fresh_clone = not os.path.isdir(os.path.join(cloned_repo_path, ".git"))
+    if is_fresh_clone and os.path.exists(cloned_repo_path):
+        shutil.rmtree(cloned_repo_path)
+
+    return cloned_repo_path, is_fresh_clone
+
+def _finish_clone(cloned_repo_path, output_dir):
+    # mtime marks the clone as recently used for eviction
+    os.utime(cloned_repo_path)
+    evict_stale_clones(output_dir, cloned_repo_path)
+
+def clone_repository(github_url, output_dir):
+    cloned_repo_path, is_fresh_clone = _prepare_clone_path(github_url, output_dir)
+    is_current = not is_fresh_clone and is_clone_current(cloned_repo_path)
+
+    try:
+        for command in [] if is_current else _clone_commands(github_url, cloned_repo_path):
+            subprocess.run(command, check=True)
+    except subprocess.CalledProcessError:
+        # Never leave a half-cloned repository behind to be mistaken for a cache hit
+        if is_fresh_clone:
+            shutil.rmtree(cloned_repo_path, ignore_errors=True)
+        raise
+
+    _finish_clone(cloned_repo_path, output_dir)
     return cloned_repo_path
 
+async def _update_clone_async(github_url, output_dir):
+    # Filesystem work (including rmtree of whole clones) and contacting the
+    # remote block, so they run off the event loop
+    cloned_repo_path, is_fresh_clone = await asyncio.to_thread(_prepare_clone_path, github_url, output_dir)
+    is_current = not is_fresh_clone and await asyncio.to_thread(is_clone_current, cloned_repo_path)
+
+    try:
+        for command in [] if is_current else _clone_commands(github_url, cloned_repo_path):
+            process = await asyncio.create_subprocess_exec(*command)
+            returncode = await process.wait()
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, command)
+    except subprocess.CalledProcessError:
+        if is_fresh_clone:
+            await asyncio.to_thread(shutil.rmtree, cloned_repo_path, ignore_errors=True)
+        raise
+
+    # mtime marks the clone as recently used for eviction
+    await asyncio.to_thread(os.utime, cloned_repo_path)
+    await _evict_stale_clones_async(output_dir, cloned_repo_path)
+
+@asynccontextmanager
+async def _held_clone_lock(cloned_repo_path):
+    # Registers the clone as in use for the block; the entry goes once unused
+    clone_lock = _clone_locks.setdefault(cloned_repo_path, CloneLock())
+    clone_lock.users += 1
+    try:
+        yield clone_lock
+    finally:
+        clone_lock.users -= 1
+        if not clone_lock.users:
+            del _clone_locks[cloned_repo_path]
+
+@asynccontextmanager
+async def clone_repository_async(github_url, output_dir):
+    """
+    Same as clone_repository, but runs git without blocking the event loop and
+    keeps the clone checked out for the duration of the block: other requests
+    for the same repository cannot fetch, reset or evict it under an analysis.
+    """
+    cloned_repo_path = get_clone_cache_path(github_url, output_dir)
+    async with _held_clone_lock(cloned_repo_path) as clone_lock:
+        async with clone_lock.write():
+            await _update_clone_async(github_url, output_dir)
+        async with clone_lock.read():
+            yield cloned_repo_path
+
 def cleanup_repo(repo_path, save=True):
     """
     Deletes the cloned repo if save=False, otherwise keeps it.
@@ -39,4 +242,15 @@ def process_repo_clone(url):
         target_clone_base_dir = REPO_CLONER_DIR
         cloned_path = clone_repository(url, target_clone_base_dir)
         return cloned_path
-    return None
\ No newline at end of file
+    return None
+
+@asynccontextmanager
+async def process_repo_clone_async(url):
+    """
+    Yields the cloned path (None for an invalid URL), held for the block.
+    """
+    if not validate_url(url):
+        yield None
+        return
+    async with clone_repository_async(url, REPO_CLONER_DIR) as cloned_path:
+        yield cloned_path
@@ -1,33 +1,140 @@
 import os
+import sys
 import json
 import re
+import ast
+import functools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import ahocorasick
+
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+PARSE_WORKERS = os.cpu_count() or 1
+# Below this many files, worker start-up costs more than parsing in-process
+PARALLEL_PARSE_MIN_FILES = 200
+PARSE_CHUNKSIZE = 8
+VALID_EXTENSIONS = ('.py', '.js', '.tsx', '.ts')
+# Larger files are almost always generated or minified bundles
+MAX_FILE_BYTES = int(os.getenv("MAX_FILE_BYTES", str(2 * 1024 * 1024)))
+TEXT_SNIFF_BYTES = 4096
+RESOLVER_CACHE_SIZE = 16384
+# Module indexes are per repository; a few cover concurrent analyses
+INDEX_CACHE_SIZE = 4
+JS_TS_EXTENSIONS = ('.js', '.ts', '.jsx', '.tsx')
+# Resolution priority for extensionless JS/TS imports: path.<ext>, then path/index.<ext>
+JS_RESOLVE_EXTENSIONS = ('.js', '.ts', '.tsx', '.jsx')
+JS_INDEX_EXTENSIONS = ('.js', '.ts', '.jsx', '.tsx')
+
+# import x, y as z  /  from x import y
+_PY_IMPORT_RE = re.compile(r'^[ \t]*(?:from[ \t]+([.\w]+)[ \t]+import\b|import[ \t]+([^\n#;]+))', re.M)
+# import x from "lib"  /  export { x } from "lib"  /  import "lib"  /  require("lib").
+# Comments and string literals are matched too, unnamed, so that the scan skips
+# over them: commented-out imports and "from" in prose never count. Only names,
+# braces, commas, * and comments may sit between import/export and from.
+_JS_IMPORT_RE = re.compile(r"""
+    //[^\n]*
+  | /\*.*?(?:\*/|\Z)
+  | "(?:\\.|[^"\\\n])*"
+  | '(?:\\.|[^'\\\n])*'
+  | `(?:\\.|[^`\\])*`
+  | (?:import|export)\b[\w$\s{},*]*?(?:(?://[^\n]*|/\*.*?\*/)[\w$\s{},*]*?)*?\bfrom\s*["'](?P<from_module>[^"'\s]+)["']
+  | import\s*["'](?P<bare_module>[^"'\s]+)["']
+  | require\(\s*["'](?P<required_module>[^"'\s]+)["']
+""", re.S | re.X)
+# function name(  /  const|let|var name = function(  /  const|let|var name = ... =>
+# (export forms match through the same alternatives). Whitespace never spans lines.
+# The search for => stops at the end of the statement (a ';' or an unbalanced
+# brace; destructured parameters may nest braces two deep), so minified
+# one-line bundles stay linear instead of rescanning the line for every var.
+_JS_FUNC_RE = re.compile(r"""
+    \bfunction[ \t]+(?P<fn_name>[A-Za-z0-9_]+)[ \t]*\(
+  | \b(?:const|let|var)[ \t]+(?P<var_name>[A-Za-z0-9_]+)[ \t]*=[ \t]*
+    (?:function[ \t]*\(|(?:[^\n;{}]|\{(?:[^\n;{}]|\{[^\n;{}]*\})*\})*?=>)
+""", re.X)
+# Tokens that matter when matching braces: comments, complete string literals, braces
+_JS_BLOCK_TOKEN_RE = re.compile(r"""
+    //[^\n]*
+  | /\*.*?(?:\*/|\Z)
+  | "(?:\\.|[^"\\\n])*"
+  | '(?:\\.|[^'\\\n])*'
+  | `(?:\\.|[^`\\])*`
+  | [{}]
+""", re.S | re.X)
 
 def discover_and_filter_files(repo_root_path):
-    filtered_files = []
-    valid_extensions = ['.py', '.js', '.tsx', '.ts']
-    
-    for root, dirs, files in os.walk(repo_root_path):
-        for file_name in files:
-            file_extension = os.path.splitext(file_name)[1]
-            if file_extension in valid_extensions:
-                full_file_path = os.path.join(root, file_name)
-                filtered_files.append(os.path.abspath(full_file_path))
-    
-    return filtered_files
+    """
+    Walk the repository with os.scandir, yielding (path, stat_result) for every
+    source file. The stat result is reused for metadata so each file is only
+    stat'd once.
+
+    Paths are absolute, normalized and interned here, once; everything
+    downstream compares them as-is.
+    """
+    yield from _scan_source_files(os.path.abspath(repo_root_path))
+
+def _scan_source_files(dir_path):
+    sub_dirs = []
+    try:
+        entries = os.scandir(dir_path)
+    except OSError:
+        # Like os.walk, skip directories that vanished or cannot be listed
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                sub_dirs.append(entry.path)
+            elif entry.name.endswith(VALID_EXTENSIONS):
+                try:
+                    file_stat = entry.stat()
+                except OSError:
+                    continue
+                # Joined onto a normalized directory, entry.path is already canonical
+                yield sys.intern(entry.path), file_stat
+
+    for sub_dir in sub_dirs:
+        yield from _scan_source_files(sub_dir)
 
 def read_file_content(file_path):
+    """
+    Returns the file's text, or None for missing, binary or non UTF-8 files.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+        with open(file_path, 'rb') as file:
+            head = file.read(TEXT_SNIFF_BYTES)
+            if b'\x00' in head:
+                print(f"Skipping binary file {file_path}")
+                return None
+            data = head + file.read()
     except FileNotFoundError:
         print(f"Error: File not found at {file_path}")
         return None
 
-def extract_file_metadata(file_path):
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError:
+        print(f"Skipping non UTF-8 file {file_path}")
+        return None
+
+    # Match text mode's universal newlines
+    return content.replace('\r\n', '\n').replace('\r', '\n')
+
+def read_source_file(file_path, file_stat):
+    """
+    read_file_content for a discovered file; files over MAX_FILE_BYTES are not
+    read at all. They are still repository files that imports resolve to.
+    """
+    if file_stat.st_size > MAX_FILE_BYTES:
+        print(f"Skipping {file_path}: {file_stat.st_size} bytes exceeds MAX_FILE_BYTES")
+        return None
+    return read_file_content(file_path)
+
+def extract_file_metadata(file_path, file_stat):
     return {
         "file_name": os.path.basename(file_path),
         "file_type": os.path.splitext(file_path)[1],
-        "file_size": os.path.getsize(file_path)
+        "file_size": file_stat.st_size
     }
 
 def detect_programming_language(file_content, file_extension):
@@ -39,216 +146,332 @@ def detect_programming_language(file_content, file_extension):
         ".tsx": "typescript xml"
     }.get(file_extension, "Unknown")
 
-def _resolve_python_import_path(base_path, module_name, all_repo_files):
-    all_repo_files_set = set(all_repo_files)
-
-    if module_name.startswith('.'):
-        dots = len(module_name) - len(module_name.lstrip('.'))
-        clean_module = module_name[dots:]
-        path_parts = base_path.split(os.sep)
-        for _ in range(dots - 1):
-            if path_parts:
-                path_parts.pop()
-        base = os.sep.join(path_parts) if path_parts else base_path
-        module_path = clean_module.replace('.', os.sep)
-    else:
-        base = base_path
-        module_path = module_name.replace('.', os.sep)
-
-    candidates = []
-    if module_path:
-        candidates += [
-            os.path.join(base, module_path + '.py'),
-            os.path.join(base, module_path, '__init__.py'),
-        ]
+@functools.lru_cache(maxsize=INDEX_CACHE_SIZE)
+def build_python_module_index(all_repo_files_set):
+    """
+    Maps every dotted name a repository .py file can be imported as, relative
+    to each of its ancestor directories, to (root, root_prefix, path) entries.
+    Packages map through their __init__.py. Entries are ordered nearest root
+    first and modules before packages, matching the old per-import candidate walk.
+    """
+    index = {}
+    for file_path in all_repo_files_set:
+        if not file_path.endswith('.py'):
+            continue
+
+        module_dir, file_name = os.path.split(file_path)
+        is_package = file_name == '__init__.py'
+        target = module_dir if is_package else file_path[:-3]
 
+        root, name_parts = os.path.split(target)
+        name_parts = [name_parts]
+        while root and root != os.path.dirname(root):
+            index.setdefault('.'.join(reversed(name_parts)), []).append(
+                (len(root), is_package, root, os.path.join(root, ''), file_path)
+            )
+            root, part = os.path.split(root)
+            name_parts.append(part)
+
+    for name, entries in index.items():
+        entries.sort(key=lambda entry: (-entry[0], entry[1]))
+        index[name] = [entry[2:] for entry in entries]
+
+    return index
+
+@functools.lru_cache(maxsize=INDEX_CACHE_SIZE)
+def build_js_module_index(all_repo_files_set):
+    """
+    Maps extensionless import targets to the JS/TS file they resolve to:
+    one map for 'path' -> path.<ext>, one for 'dir' -> dir/index.<ext>,
+    each keeping the highest priority extension.
+    """
+    by_stem = {}
+    by_dir = {}
+    for file_path in all_repo_files_set:
+        stem, ext = os.path.splitext(file_path)
+        if ext in JS_RESOLVE_EXTENSIONS:
+            rank = JS_RESOLVE_EXTENSIONS.index(ext)
+            if stem not in by_stem or rank < by_stem[stem][0]:
+                by_stem[stem] = (rank, file_path)
+        if os.path.basename(stem) == 'index' and ext in JS_INDEX_EXTENSIONS:
+            rank = JS_INDEX_EXTENSIONS.index(ext)
+            package_dir = os.path.dirname(stem)
+            if package_dir not in by_dir or rank < by_dir[package_dir][0]:
+                by_dir[package_dir] = (rank, file_path)
+
+    return (
+        {stem: file_path for stem, (_, file_path) in by_stem.items()},
+        {package_dir: file_path for package_dir, (_, file_path) in by_dir.items()},
+    )
+
+@functools.lru_cache(maxsize=RESOLVER_CACHE_SIZE)
+def _resolve_python_import_path(base_path, module_name, all_repo_files_set):
     if not module_name.startswith('.'):
-        current_base = base
-        while current_base and current_base != os.path.dirname(current_base):
-            candidates += [
-                os.path.join(current_base, module_path + '.py'),
-                os.path.join(current_base, module_path, '__init__.py'),
-            ]
-            current_base = os.path.dirname(current_base)
-
-    for path in candidates:
-        if os.path.normpath(path) in all_repo_files_set:
-            return os.path.normpath(path)
+        # Nearest ancestor of the importing file's directory that provides the module
+        for root, root_prefix, path in build_python_module_index(all_repo_files_set).get(module_name, ()):
+            if base_path == root or base_path.startswith(root_prefix):
+                return path
+        return None
+
+    dots = len(module_name) - len(module_name.lstrip('.'))
+    clean_module = module_name[dots:]
+    if not clean_module:
+        return None
+
+    path_parts = base_path.split(os.sep)
+    for _ in range(dots - 1):
+        if path_parts:
+            path_parts.pop()
+    base = os.sep.join(path_parts) if path_parts else base_path
+    module_path = clean_module.replace('.', os.sep)
+
+    for path in (
+        os.path.join(base, module_path + '.py'),
+        os.path.join(base, module_path, '__init__.py'),
+    ):
+        path = os.path.normpath(path)
+        if path in all_repo_files_set:
+            return path
 
     return None
 
-def _resolve_js_ts_jsx_tsx_path(base_path, module_path, all_repo_files):
-    all_repo_files_set = set(all_repo_files)
-    possible_extensions = ['.js', '.ts', '.tsx', '.jsx']
-    index_files = ['/index.js', '/index.ts', '/index.jsx', '/index.tsx']
+@functools.lru_cache(maxsize=RESOLVER_CACHE_SIZE)
+def _resolve_js_ts_jsx_tsx_path(base_path, module_path, all_repo_files_set):
     path_without_quotes = module_path.strip("'\"")
 
     if path_without_quotes.startswith(('./', '../', '/')):
-        base_candidate = os.path.join(base_path, path_without_quotes)
-        for ext in [''] + possible_extensions + index_files:
-            candidate = os.path.normpath(base_candidate + ext)
-            if candidate in all_repo_files_set:
-                return candidate
+        base_candidate = os.path.normpath(os.path.join(base_path, path_without_quotes))
+        if base_candidate in all_repo_files_set:
+            return base_candidate
+
+        by_stem, by_dir = build_js_module_index(all_repo_files_set)
+        # 'dir/', '.' and '..' can only mean an index file
+        if os.path.basename(path_without_quotes) not in ('', '.', '..') and base_candidate in by_stem:
+            return by_stem[base_candidate]
+        return by_dir.get(base_candidate)
 
     return None
 
-def find_dependencies(file_content, file_path, all_repo_files):
-    dependencies = []
-    all_repo_files_set = set(all_repo_files)
-    file_extension = os.path.splitext(file_path)[1].lower()
-    language_category = 'python' if file_extension == '.py' else (
-        'js_ts_jsx_tsx' if file_extension in ['.js', '.ts', '.jsx', '.tsx'] else 'other'
-    )
-    current_dir = os.path.dirname(file_path)
+def _parse_import_modules(file_content, file_extension):
+    """
+    Return every imported module name (Python) or module specifier (JS/TS)
+    in file order, using a single regex pass over the whole file.
+    """
+    modules = []
 
-    if language_category == "python":
-        for line in file_content.splitlines():
-            stripped_line = line.strip()
-            module_name = None
-            if not stripped_line or stripped_line.startswith('#'):
+    if file_extension == ".py":
+        for match in _PY_IMPORT_RE.finditer(file_content):
+            from_module, import_part = match.groups()
+            if from_module:
+                modules.append(from_module)
                 continue
-            if stripped_line.startswith("import "):
-                import_part = stripped_line[7:].strip().split(" as ")[0].split(',')[0].split('#')[0].strip()
-                module_name = import_part
-            elif stripped_line.startswith("from "):
-                from_part = stripped_line[5:].strip()
-                if " import " in from_part:
-                    module_name = from_part.split(" import ")[0].split('#')[0].strip()
-            if module_name:
-                resolved_path = _resolve_python_import_path(current_dir, module_name, all_repo_files)
-                if resolved_path and resolved_path != file_path:
-                    dependencies.append(resolved_path)
-
-    elif language_category == "js_ts_jsx_tsx":
-        for line in file_content.splitlines():
-            stripped_line = line.strip()
-            module_path_str = None
-            if not stripped_line or stripped_line.startswith('//') or stripped_line.startswith('/*'):
+            # Handle: import x, y as z
+            for module_name in import_part.split(","):
+                module_name = module_name.split()
+                if module_name:
+                    modules.append(module_name[0])
+
+    elif file_extension in JS_TS_EXTENSIONS:
+        for match in _JS_IMPORT_RE.finditer(file_content):
+            if match.lastgroup is None:
                 continue
-            if "import" in stripped_line and " from " in stripped_line:
-                import_path_part = stripped_line.split(" from ")[-1].strip()
-                if import_path_part[0] in ['"', "'"]:
-                    module_path_str = import_path_part[1:].split(import_path_part[0])[0]
-            elif stripped_line.startswith("import "):
-                import_part = stripped_line[7:].strip()
-                if import_part[0] in ['"', "'"]:
-                    module_path_str = import_part[1:].split(import_part[0])[0]
-            elif "require(" in stripped_line:
-                after_require = stripped_line.split("require(", 1)[1]
-                for q in ['"', "'"]:
-                    if q in after_require:
-                        module_path_str = after_require.split(q)[1]
-                        break
-            if module_path_str and module_path_str.startswith(('./', '../', '/')):
-                resolved = _resolve_js_ts_jsx_tsx_path(current_dir, module_path_str, all_repo_files)
+            start = match.start()
+            if match.lastgroup == "required_module":
+                if start and (file_content[start - 1].isalnum() or file_content[start - 1] in "_$"):
+                    continue
+            else:
+                # import/export must start a statement: a line, or follow a ';'
+                line_prefix = file_content[file_content.rfind("\n", 0, start) + 1:start].rstrip()
+                if line_prefix and not line_prefix.endswith(";"):
+                    continue
+            modules.append(match.group(match.lastgroup))
+
+    return modules
+
+def find_imports(file_content, file_path, all_repo_files_set):
+    """
+    Parse the imports of a file once and split them into in-repo dependencies
+    (absolute paths) and external libraries.
+    all_repo_files_set must be a frozenset: it is built once per repository
+    and is part of the resolvers' cache key.
+    """
+    # dicts as insertion-ordered sets: deduplicated, in import order
+    dependencies = {}
+    external_deps = {}
+    file_extension = os.path.splitext(file_path)[1].lower()
+    current_dir = os.path.dirname(file_path)
+
+    if file_extension == ".py":
+        for module_name in _parse_import_modules(file_content, file_extension):
+            resolved_path = _resolve_python_import_path(current_dir, module_name, all_repo_files_set)
+            if resolved_path and resolved_path != file_path:
+                dependencies[resolved_path] = None
+
+            if not module_name.startswith("."):
+                possible_path = os.path.join(current_dir, *module_name.split(".")) + ".py"
+                if possible_path not in all_repo_files_set:
+                    external_deps[module_name] = None
+
+    elif file_extension in JS_TS_EXTENSIONS:
+        for module_path in _parse_import_modules(file_content, file_extension):
+            if module_path.startswith(('./', '../', '/')):
+                resolved = _resolve_js_ts_jsx_tsx_path(current_dir, module_path, all_repo_files_set)
                 if resolved and resolved != file_path:
-                    dependencies.append(resolved)
+                    dependencies[resolved] = None
+            elif not module_path.startswith("."):
+                external_deps[module_path] = None
 
-    return list(set(dependencies))
+    return list(dependencies), list(external_deps)
 
-def extract_function_definitions_with_code(file_content, language):
+def find_dependencies(file_content, file_path, all_repo_files_set):
+    return find_imports(file_content, file_path, all_repo_files_set)[0]
+
+# Fields holding statement lists, in ast field order (match_case and ExceptHandler
+# nodes carry a body)
+_AST_STATEMENT_LIST_FIELDS = ('body', 'handlers', 'orelse', 'finalbody', 'cases')
+
+def _extract_python_functions_from_ast(file_content):
     """
-    Extract function names along with their complete code structure.
-    Returns a list of dictionaries with 'name' and 'code' keys.
+    Collect every def/async def that is not nested inside another function,
+    with decorators included in its code. Returns None if the file does not parse.
+
+    ast.parse makes this roughly 15x slower than the line scanner below, which
+    is kept only as a fallback because it misses async defs, multi-line
+    signatures and decorators, and picks up defs inside strings.
     """
+    try:
+        tree = ast.parse(file_content)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+
+    # ast numbers lines by '\n' only; splitlines() would also break on form
+    # feeds, \x85, \u2028 and friends and shift every later function
+    lines = file_content.split('\n')
+
     functions = []
-    lines = file_content.splitlines()
+    # Depth-first in source order, without descending into function bodies.
+    # A def can only appear in a statement list, so expressions are never visited.
+    nodes = tree.body[::-1]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            functions.append({
+                "name": node.name,
+                "code": "\n".join(lines[start - 1:node.end_lineno])
+            })
+            continue
+        children = []
+        for field in _AST_STATEMENT_LIST_FIELDS:
+            children.extend(getattr(node, field, ()))
+        nodes.extend(children[::-1])
 
-    if language == "python":
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
+    return functions
+
+def _extract_python_functions_by_indent(lines):
+    """
+    Indentation-based fallback for sources the ast module cannot parse.
+    """
+    functions = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        
+        if stripped.startswith("def ") and "(" in stripped and ":" in stripped:
+            # Extract function name
+            name_start = stripped.find("def ") + len("def ")
+            name_end = stripped.find("(", name_start)
+            func_name = stripped[name_start:name_end].strip()
             
-            if stripped.startswith("def ") and "(" in stripped and ":" in stripped:
-                # Extract function name
-                name_start = stripped.find("def ") + len("def ")
-                name_end = stripped.find("(", name_start)
-                func_name = stripped[name_start:name_end].strip()
+            if func_name and " " not in func_name:
+                # Get indentation level
+                indent_level = len(line) - len(line.lstrip())
                 
-                if func_name and " " not in func_name:
-                    # Get indentation level
-                    indent_level = len(line) - len(line.lstrip())
-                    
-                    # Collect function code
-                    func_lines = [line]
-                    i += 1
+                # Collect function code
+                func_lines = [line]
+                i += 1
+                
+                # Continue collecting lines that are part of the function
+                while i < len(lines):
+                    current_line = lines[i]
+                    current_stripped = current_line.strip()
                     
-                    # Continue collecting lines that are part of the function
-                    while i < len(lines):
-                        current_line = lines[i]
-                        current_stripped = current_line.strip()
-                        
-                        # Stop if we hit a line with same or less indentation (unless it's empty or comment)
-                        if current_stripped and not current_stripped.startswith('#'):
-                            current_indent = len(current_line) - len(current_line.lstrip())
-                            if current_indent <= indent_level:
-                                break
-                        
-                        func_lines.append(current_line)
-                        i += 1
+                    # Stop if we hit a line with same or less indentation (unless it's empty or comment)
+                    if current_stripped and not current_stripped.startswith('#'):
+                        current_indent = len(current_line) - len(current_line.lstrip())
+                        if current_indent <= indent_level:
+                            break
                     
-                    functions.append({
-                        "name": func_name,
-                        "code": "\n".join(func_lines)
-                    })
-                    continue
-            i += 1
+                    func_lines.append(current_line)
+                    i += 1
+                
+                functions.append({
+                    "name": func_name,
+                    "code": "\n".join(func_lines)
+                })
+                continue
+        i += 1
+
+    return functions
+
+def _line_end(file_content, offset):
+    line_end = file_content.find('\n', offset)
+    return len(file_content) if line_end == -1 else line_end
+
+def _find_block_end(file_content, start, header_end):
+    """
+    Return the offset where a block starting on the header line [start, header_end)
+    closes. If the header leaves no brace open the block ends with the header line;
+    otherwise scanning continues to the matching closing brace. Braces inside
+    strings and comments are skipped.
+    """
+    depth = 0
+    for token in _JS_BLOCK_TOKEN_RE.finditer(file_content, start):
+        if depth == 0 and token.start() >= header_end:
+            return header_end
+        token_text = token.group()
+        if token_text == '{':
+            depth += 1
+        elif token_text == '}' and depth:
+            depth -= 1
+            if depth == 0 and token.end() > header_end:
+                return token.end()
+    return header_end if depth == 0 else len(file_content)
+
+def extract_function_definitions_with_code(file_content, language):
+    """
+    Extract function names along with their complete code structure.
+    Returns a list of dictionaries with 'name' and 'code' keys.
+    """
+    functions = []
+
+    if language == "python":
+        functions = _extract_python_functions_from_ast(file_content)
+        if functions is None:
+            functions = _extract_python_functions_by_indent(file_content.splitlines())
 
     elif language in ["javascript", "typescript", "javascript xml", "typescript xml"]:
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
-            
-            # Patterns for different function declarations
-            patterns = [
-                (r'function\s+([a-zA-Z0-9_]+)\s*\(', 'function'),
-                (r'const\s+([a-zA-Z0-9_]+)\s*=\s*function\s*\(', 'const_function'),
-                (r'const\s+([a-zA-Z0-9_]+)\s*=\s*\(?.*?\)?\s*=>', 'arrow'),
-                (r'let\s+([a-zA-Z0-9_]+)\s*=\s*function\s*\(', 'let_function'),
-                (r'let\s+([a-zA-Z0-9_]+)\s*=\s*\(?.*?\)?\s*=>', 'let_arrow'),
-                (r'export\s+function\s+([a-zA-Z0-9_]+)\s*\(', 'export_function'),
-                (r'export\s+const\s+([a-zA-Z0-9_]+)\s*=\s*\(?.*?\)?\s*=>', 'export_arrow')
-            ]
-            
-            for pattern, func_type in patterns:
-                match = re.search(pattern, stripped)
-                if match:
-                    func_name = match.group(1)
-                    func_lines = [line]
-                    i += 1
-                    
-                    # Track braces to find function end
-                    brace_count = stripped.count('{') - stripped.count('}')
-                    
-                    # For arrow functions, check if it's single line
-                    if 'arrow' in func_type and '=>' in stripped:
-                        if '{' not in stripped:
-                            # Single line arrow function
-                            functions.append({
-                                "name": func_name,
-                                "code": line
-                            })
-                            break
-                    
-                    # Multi-line function - collect until braces match
-                    while i < len(lines) and brace_count > 0:
-                        current_line = lines[i]
-                        func_lines.append(current_line)
-                        brace_count += current_line.count('{') - current_line.count('}')
-                        i += 1
-                    
-                    if func_lines:
-                        functions.append({
-                            "name": func_name,
-                            "code": "\n".join(func_lines)
-                        })
-                    break
-            else:
-                i += 1
+        # One scan over the whole file; a declaration's code runs from the start
+        # of its line to the end of the line holding its closing brace
+        next_start = 0
+        for match in _JS_FUNC_RE.finditer(file_content):
+            # Skip declarations nested in the previous body or sharing its line
+            if match.start() < next_start:
                 continue
-            break
+
+            line_start = file_content.rfind('\n', 0, match.start()) + 1
+            line_end = _line_end(file_content, match.end())
+            # Single line arrow functions and bodiless declarations end on this line;
+            # otherwise scan forward to the matching closing brace
+            if '{' in file_content[line_start:line_end]:
+                line_end = _line_end(file_content, _find_block_end(file_content, line_start, line_end))
+
+            functions.append({
+                "name": match.group("fn_name") or match.group("var_name"),
+                "code": file_content[line_start:line_end]
+            })
+            next_start = line_end + 1
 
     # Remove duplicates based on function name
     seen = set()
@@ -267,137 +490,162 @@ def extract_function_definitions(file_content, language):
     functions_with_code = extract_function_definitions_with_code(file_content, language)
     return [func["name"] for func in functions_with_code]
 
-def find_external_imports(file_content, file_path, all_repo_files):
-    external_deps = set()
-    all_repo_files_set = set(all_repo_files)
-    curr_dir = os.path.dirname(file_path)
-    file_extension = os.path.splitext(file_path)[1].lower()
+def find_external_imports(file_content, file_path, all_repo_files_set):
+    return find_imports(file_content, file_path, all_repo_files_set)[1]
 
-    if file_extension == ".py":
-        for line in file_content.splitlines():
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#"):
-                continue
+def find_occurring_names(content, names):
+    """
+    Return the set of names that occur anywhere in content (plain substring
+    semantics), using one Aho-Corasick pass instead of a search per name.
+    """
+    automaton = ahocorasick.Automaton()
+    for name in names:
+        automaton.add_word(name, name)
+    if len(automaton) == 0:
+        return set()
 
-            # Handle: import x, y
-            if stripped.startswith("import "):
-                import_part = stripped[7:].strip()
-                module_names = [m.strip() for m in import_part.split(",")]
-                for module_name in module_names:
-                    if "#" in module_name:
-                        module_name = module_name.split("#")[0].strip()
-                    if not module_name.startswith("."):
-                        possible_path = os.path.join(curr_dir, *module_name.split(".")) + ".py"
-                        normalized = os.path.normpath(possible_path)
-                        if normalized not in all_repo_files_set:
-                            external_deps.add(module_name)
-
-            # Handle: from x import y
-            elif stripped.startswith("from "):
-                from_part = stripped[5:].strip()
-                if "import" in from_part:
-                    module_name = from_part.split(" import ")[0].strip()
-                    if "#" in module_name:
-                        module_name = module_name.split("#")[0].strip()
-                    if not module_name.startswith("."):
-                        possible_path = os.path.join(curr_dir, *module_name.split(".")) + ".py"
-                        normalized = os.path.normpath(possible_path)
-                        if normalized not in all_repo_files_set:
-                            external_deps.add(module_name)
-
-    elif file_extension in [".js", ".ts", ".jsx", ".tsx"]:
-        for line in file_content.splitlines():
-            stripped = line.strip()
-            module_path = None
-            if not stripped or stripped.startswith("//") or stripped.startswith("/*"):
-                continue
+    automaton.make_automaton()
+    return {name for _, name in automaton.iter(content)}
 
-            # Handle: import something from "lib"
-            if "import" in stripped and "from" in stripped:
-                from_idx = stripped.find("from")
-                if from_idx != -1:
-                    import_path_part = stripped[from_idx + 4:].strip()
-                    if import_path_part.startswith(("'", '"')):
-                        quote_char = import_path_part[0]
-                        end_quote_idx = import_path_part.find(quote_char, 1)
-                        if end_quote_idx != -1:
-                            module_path = import_path_part[1:end_quote_idx]
-
-            # Handle: import "lib"
-            elif stripped.startswith("import "):
-                import_path = stripped[7:].strip()
-                if import_path.startswith(("'", '"')):
-                    quote_char = import_path[0]
-                    end_quote_idx = import_path.find(quote_char, 1)
-                    if end_quote_idx != -1:
-                        module_path = import_path[1:end_quote_idx]
-
-            # Handle: const x = require("lib")
-            elif "require(" in stripped:
-                start_idx = stripped.find("require(") + len("require(")
-                after = stripped[start_idx:].strip()
-                if after.startswith(("'", '"')):
-                    quote_char = after[0]
-                    end_quote_idx = after.find(quote_char, 1)
-                    if end_quote_idx != -1:
-                        module_path = after[1:end_quote_idx]
-
-            # Final check: skip relative paths
-            if module_path and not module_path.startswith((".", "/", "../")):
-                external_deps.add(module_path)
-
-    return list(external_deps)
-
-def process_repository_for_json(repo_root_path):
-    all_repo_files = [os.path.abspath(p) for p in discover_and_filter_files(repo_root_path)]
-    processed_files_data = []
-    all_repo_files_set = set(all_repo_files)
-    file_content_cache = {}
+def warm_up_parsers():
+    """
+    Runs every extractor once on a tiny sample as a startup smoke check, so a
+    broken parser fails when the API starts rather than on the first analysis.
+    All patterns already compile at import, so there is no first-use cost left
+    for this to absorb.
+    """
+    extract_function_definitions_with_code("@d\ndef f():\n    pass\n", "python")
+    extract_function_definitions_with_code("function f() {\n  return '}'\n}\nconst g = () => 1\n", "javascript")
+    _parse_import_modules("import os\nfrom . import x\n", ".py")
+    _parse_import_modules("import x from 'x'\nrequire('y')\n", ".js")
+    find_occurring_names("f()", ["f"])
+
+def process_single_file(repo_root_path, file_path, file_stat, content, all_repo_files_set):
+    """
+    Per-file half of the pipeline: metadata, functions and imports.
+    Returns the file entry along with its absolute dependency paths, which the
+    cross-file pass in process_repository_for_json needs.
+    """
+    metadata = extract_file_metadata(file_path, file_stat)
+    language = detect_programming_language(content, metadata["file_type"])
+
+    # Extract functions with their code
+    functions_with_code = extract_function_definitions_with_code(content, language)
+
+    dependencies, external_libraries = find_imports(content, file_path, all_repo_files_set)
+
+    file_entry = {
+        "file_path": os.path.relpath(file_path, repo_root_path),
+        "metadata": metadata,
+        "language": language,
+        "functions": functions_with_code,  # Now includes both name and code
+        "dependencies": [],
+        "used_functions_from_dependencies_hints": [],
+        "external_libraries": external_libraries
+    }
+    return file_entry, dependencies
+
+# Per-repository state of a parse worker, set once by the pool initializer so the
+# file set is not pickled along with every task
+_worker_repo_root_path = None
+_worker_repo_files_set = frozenset()
+
+def _init_parse_worker(repo_root_path, all_repo_files_set):
+    global _worker_repo_root_path, _worker_repo_files_set
+    _worker_repo_root_path = repo_root_path
+    _worker_repo_files_set = all_repo_files_set
+
+def _process_file_in_worker(file_path, file_stat, content):
+    return process_single_file(_worker_repo_root_path, file_path, file_stat, content, _worker_repo_files_set)
+
+def process_repository_for_json(repo_root_path, parse_workers=1):
+    return list(iter_process_repository(repo_root_path, parse_workers))
+
+def iter_process_repository(repo_root_path, parse_workers=1):
+    """
+    Yields one fully populated file entry at a time. Every file is parsed up
+    front (the cross-reference pass needs all defined functions), then entries
+    are emitted as their dependency hints are resolved.
+
+    With parse_workers > 1, repositories of PARALLEL_PARSE_MIN_FILES or more
+    are parsed on a spawn-based process pool. Spawned workers re-import the
+    calling script, so scripts passing parse_workers > 1 must guard their entry
+    point with if __name__ == "__main__". The default parses in-process.
+    """
+    discovered_files = list(discover_and_filter_files(repo_root_path))
+    all_repo_files = [file_path for file_path, _ in discovered_files]
+    all_repo_files_set = frozenset(all_repo_files)
     file_defined_functions_cache = {}
+    file_basename_cache = {}
+
+    # Reads are I/O bound, so overlap them on a thread pool before the CPU work
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        file_contents = list(executor.map(
+            read_source_file, all_repo_files, [file_stat for _, file_stat in discovered_files]
+        ))
+
+    file_jobs = [
+        (file_path, file_stat, content)
+        for (file_path, file_stat), content in zip(discovered_files, file_contents)
+        if content is not None
+    ]
+    del discovered_files, file_contents
+
+    # Per-file parsing is independent CPU work, so large repositories fan it out
+    # across processes; a single worker would only add start-up and pickling costs
+    if parse_workers > 1 and len(file_jobs) >= PARALLEL_PARSE_MIN_FILES:
+        with ProcessPoolExecutor(
+            max_workers=parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_parse_worker,
+            initargs=(repo_root_path, all_repo_files_set)
+        ) as executor:
+            results = list(executor.map(_process_file_in_worker, *zip(*file_jobs), chunksize=PARSE_CHUNKSIZE))
+    else:
+        results = [
+            process_single_file(repo_root_path, file_path, file_stat, content, all_repo_files_set)
+            for file_path, file_stat, content in file_jobs
+        ]
 
-    for file_path in all_repo_files:
-        content = read_file_content(file_path)
-        if content is None:
-            continue
+    # The only references to each file's content and entry, consumed as they are
+    # emitted so memory falls while the stream advances
+    pending_files = deque()
+    for (abs_path, _, content), (file_entry, dependencies) in zip(file_jobs, results):
+        file_defined_functions_cache[abs_path] = [func["name"] for func in file_entry["functions"]]
+        file_basename_cache[abs_path] = file_entry["metadata"]["file_name"]
+        pending_files.append((abs_path, content, file_entry, dependencies))
+    del file_jobs, results
 
-        abs_path = os.path.abspath(file_path)
-        file_content_cache[abs_path] = content
+    # Dependencies are repository files, so they all start with the root prefix
+    repo_root_prefix = os.path.join(os.path.abspath(repo_root_path), "")
 
-        metadata = extract_file_metadata(abs_path)
-        language = detect_programming_language(content, metadata["file_type"])
-        
-        # Extract functions with their code
-        functions_with_code = extract_function_definitions_with_code(content, language)
-        defined_functions = [func["name"] for func in functions_with_code]
-        file_defined_functions_cache[abs_path] = defined_functions or []
-
-        processed_files_data.append({
-            "file_path": os.path.relpath(abs_path, repo_root_path),
-            "metadata": metadata,
-            "language": language,
-            "functions": functions_with_code,  # Now includes both name and code
-            "dependencies": [],
-            "used_functions_from_dependencies_hints": [],
-            "external_libraries": find_external_imports(content, file_path, all_repo_files)
-        })
-
-    for file_entry in processed_files_data:
-        abs_file_path = os.path.abspath(os.path.join(repo_root_path, file_entry["file_path"]))
-        content = file_content_cache.get(abs_file_path, "")
-
-        # Ensure dependencies is always a list
-        abs_dependencies = find_dependencies(content, abs_file_path, all_repo_files_set) or []
+    while pending_files:
+        abs_file_path, content, file_entry, abs_dependencies = pending_files.popleft()
 
         file_entry["dependencies"] = [
-            os.path.relpath(dep, repo_root_path) for dep in abs_dependencies
+            dep[len(repo_root_prefix):] if dep.startswith(repo_root_prefix) else os.path.relpath(dep, repo_root_path)
+            for dep in abs_dependencies
         ]
 
-        used_hints = []
-        for dep_path in abs_dependencies:
-            for func_name in file_defined_functions_cache.get(dep_path, []):
-                if func_name in content:
-                    used_hints.append(f"{os.path.basename(dep_path)}:{func_name}")
+        # Looked up once per dependency, not once per function
+        dependency_functions = [
+            (file_basename_cache[dep_path], file_defined_functions_cache[dep_path])
+            for dep_path in abs_dependencies
+            if file_defined_functions_cache.get(dep_path)
+        ]
+        used_names = find_occurring_names(content, (
+            func_name for _, func_names in dependency_functions for func_name in func_names
+        ))
+        # Contents are not needed once a file's hints are resolved
+        del content
+
+        used_hints = [
+            f"{dep_basename}:{func_name}"
+            for dep_basename, func_names in dependency_functions
+            for func_name in func_names
+            if func_name in used_names
+        ]
 
         file_entry["used_functions_from_dependencies_hints"] = used_hints
-
-    return processed_files_data
+        yield file_entry
+        del file_entry
@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from src.file_processing import extract_function_definitions_with_code, find_imports
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Far above the linear scan's runtime even on slow CI; the quadratic scan
+# needs tens of minutes for the inputs below
+EXTRACTION_TIMEOUT_SECONDS = 60
+_EXTRACT_SCRIPT = (
+    "import json, sys\n"
+    "from src.file_processing import extract_function_definitions_with_code\n"
+    "print(json.dumps(extract_function_definitions_with_code(sys.stdin.read(), sys.argv[1])))\n"
+)
+
+
+class JavaScriptFunctionExtractionTest(unittest.TestCase):
+    def extract_with_timeout(self, content, language):
+        # re holds the GIL for a whole search, so only a separate process can be
+        # stopped when a pattern goes quadratic
+        try:
+            completed = subprocess.run(
+                [sys.executable, "-c", _EXTRACT_SCRIPT, language],
+                input=content, capture_output=True, text=True, check=True,
+                cwd=BACKEND_DIR, timeout=EXTRACTION_TIMEOUT_SECONDS
+            )
+        except subprocess.TimeoutExpired:
+            self.fail(f"extraction took over {EXTRACTION_TIMEOUT_SECONDS}s")
+        return json.loads(completed.stdout)
+
+    def test_minified_single_line_stays_linear(self):
+        # One long line of declarations without any arrow function used to make
+        # the => lookahead rescan the rest of the line for every var/const.
+        # Both inputs stay under MAX_FILE_BYTES, so such files do reach the parser.
+        for keyword in ("var", "const"):
+            content = "".join(f"{keyword} a{i}=1;" for i in range(120000))
+            self.assertEqual(self.extract_with_timeout(content, "javascript"), [])
+
+    def test_arrow_functions_with_destructured_parameters(self):
+        content = (
+            "const App = ({ onDone, opts = {} }) => {\n"
+            "  return onDone(opts)\n"
+            "}\n"
+            "const add = (a, b) => a + b\n"
+            "var plain = 1; const twice = x => x * 2\n"
+        )
+        functions = extract_function_definitions_with_code(content, "javascript")
+        self.assertEqual([func["name"] for func in functions], ["App", "add", "twice"])
+        self.assertEqual(
+            functions[0]["code"],
+            "const App = ({ onDone, opts = {} }) => {\n  return onDone(opts)\n}"
+        )
+
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.sep, "repo"))
+
+
+def repo_path(*parts):
+    return os.path.join(REPO_ROOT, *parts)
+
+
+class ImportResolutionTest(unittest.TestCase):
+    # Expectations match the pre-index, per-import candidate walk
+    repo_files = frozenset([
+        repo_path("utils.py"),
+        repo_path("app", "main.py"),
+        repo_path("app", "utils.py"),
+        repo_path("app", "sub", "worker.py"),
+        repo_path("pkg.py"),
+        repo_path("pkg", "__init__.py"),
+        repo_path("lib", "core", "__init__.py"),
+        repo_path("web", "src", "App.tsx"),
+        repo_path("web", "src", "comp.tsx"),
+        repo_path("web", "src", "comp", "index.ts"),
+        repo_path("web", "src", "comp", "index.js"),
+        repo_path("web", "src", "util.ts"),
+        repo_path("web", "src", "util.js"),
+    ])
+
+    def dependencies(self, content, *importer):
+        return find_imports(content, repo_path(*importer), self.repo_files)[0]
+
+    def test_python_import_resolves_against_nearest_ancestor_root(self):
+        self.assertEqual(self.dependencies("import utils\n", "app", "main.py"), [repo_path("app", "utils.py")])
+        self.assertEqual(self.dependencies("import utils\n", "app", "sub", "worker.py"), [repo_path("app", "utils.py")])
+
+    def test_python_module_wins_over_package(self):
+        self.assertEqual(self.dependencies("import pkg\n", "app", "main.py"), [repo_path("pkg.py")])
+        self.assertEqual(
+            self.dependencies("import lib.core\n", "app", "main.py"),
+            [repo_path("lib", "core", "__init__.py")]
+        )
+
+    def test_js_directory_import_resolves_to_index(self):
+        self.assertEqual(
+            self.dependencies("import a from './comp/'\n", "web", "src", "App.tsx"),
+            [repo_path("web", "src", "comp", "index.js")]
+        )
+
+    def test_js_file_wins_over_index_and_js_over_ts(self):
+        self.assertEqual(
+            self.dependencies("import b from './comp'\nimport c from './util'\n", "web", "src", "App.tsx"),
+            [repo_path("web", "src", "comp.tsx"), repo_path("web", "src", "util.js")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()